@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
+import csv
+import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime, date
 from pathlib import Path
-import re
 import streamlit_authenticator as stauth
 
 # -------------------------------------------------------
@@ -77,48 +85,347 @@ APP_DIR = Path(__file__).parent
 DATA_DIR = Path("/var/data")
 DATA_DIR.mkdir(exist_ok=True)
 
-# CSV files stored on the disk (persistent across deploys)
-REPAIRS_CSV = DATA_DIR / "repairs_data.csv"
-TRUCKS_CSV = DATA_DIR / "trucks_data.csv"
-ALERTS_CSV = DATA_DIR / "alerts_data.csv"
+# Parquet files stored on the disk (persistent across deploys)
+REPAIRS_FILE = DATA_DIR / "repairs_data.parquet"
+TRUCKS_FILE = DATA_DIR / "trucks_data.parquet"
+ALERTS_FILE = DATA_DIR / "alerts_data.parquet"
 
 # Backups folder on disk
 BACKUPS_DIR = DATA_DIR / "Backups"
 BACKUPS_DIR.mkdir(exist_ok=True)
 
+# Inline edits are written at most this often; in between they stay in session state
+AUTOSAVE_INTERVAL_S = 2.0
+
+# Rows sent to the browser per editor page; larger filtered views get a start-row slider
+PAGE_SIZE = 200
+
 default_alerts_df = pd.DataFrame({"Alert Type": ALERT_TYPES})
 
+# Dates are kept as datetime64 in memory; this format is only for text (journal, legacy CSV)
+DATE_FMT = "%m/%d/%Y"
+DATE_COLS = ["Date", "Scheduled", "Completed Date", "Open/Miles at"]
+
+# Narrow nullable ints for counters; Cost stays float64 so dollar-and-cent sums stay exact enough
+NUMERIC_COLS = {"Ticket ID": "Int32", "Mileage": "Int32", "Downtime (Days)": "Int32", "Cost": "float64"}
+
+STATUS_OPTIONS = ["Open", "Scheduled", "Completed"]
+PRIORITY_OPTIONS = ["Tier 1 (Critical)", "Tier 2 (High)", "Tier 3 (PM)", "Tier 4 (Non-Critical)"]
+SERVICE_TYPES = ["SERVICE", "FLATBED", "AUTO LOADER", "TRACTOR", "TRAILER", "WRECKER"]
+
+# Low-cardinality columns held as pandas categoricals (known options first, then any
+# other values found in the data). Only columns edited through selectboxes belong here:
+# a categorical cell rejects values outside its categories.
+CATEGORICAL_COLS = {
+    "Status": STATUS_OPTIONS,
+    "Priority Tier (1/2/3)": PRIORITY_OPTIONS,
+    "Unit #": [],
+    "YMM": [],
+    "Service Type": SERVICE_TYPES,
+}
+
 # -------------------------------------------------------
 # UTILS
 # -------------------------------------------------------
-def backup_df_csv(src_path: Path, df: pd.DataFrame):
+def temp_path(path: Path):
+    # Unique per writer, so concurrent saves never share a tmp file; same directory as the
+    # target so os.replace stays an atomic rename
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+def write_parquet(path: Path, df: pd.DataFrame):
+    # Write beside the target and rename over it, so readers never see a half-written file
+    tmp = temp_path(path)
+    try:
+        df.to_parquet(tmp, index=False, compression="zstd")
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def journal_path(path: Path):
+    # Rows appended since the last full save live here until save_df folds them in
+    return path.with_suffix(".journal.csv")
+
+def csv_schema(default_df: pd.DataFrame):
+    # read_csv dtypes and date columns taken from the seed frame, so CSV reads skip inference
+    dtypes, dates = {}, []
+    for col, dtype in default_df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            dates.append(col)
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = "object"
+    return dtypes, dates
+
+ARROW_TYPES = {"object": pa.string(), "Int64": pa.int64(), "float64": pa.float64()}
+
+def arrow_csv_options(dtypes: dict, dates: list):
+    # Arrow parser settings; quoted newlines are allowed since Notes can span lines.
+    # Blank text stays "" (as the app writes it), blank numbers and dates still read as null.
+    column_types = {c: ARROW_TYPES[t] for c, t in dtypes.items()}
+    column_types.update({c: pa.timestamp("ns") for c in dates})
+    return dict(
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            timestamp_parsers=[DATE_FMT],
+            strings_can_be_null=False,
+        ),
+    )
+
+def read_csv_arrow(path_str: str, dtypes: dict, dates: list):
+    # Multithreaded Arrow parse of the whole file
+    table = pacsv.read_csv(path_str, **arrow_csv_options(dtypes, dates))
+    return table.to_pandas(self_destruct=True, types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+def read_csv_typed(path_str: str, dtypes: dict, dates: list):
+    try:
+        return read_csv_arrow(path_str, dtypes, dates)
+    except pa.ArrowInvalid:
+        pass
+    # Same blank handling as the Arrow path: "" for text, NA for everything else
+    text = {c: t for c, t in dtypes.items() if t == "object"}
+    na_values = {c: [""] for c in [*dtypes, *dates] if c not in text}
+    try:
+        return pd.read_csv(
+            path_str, dtype=dtypes, parse_dates=dates, date_format=DATE_FMT, engine="c",
+            keep_default_na=False, na_values=na_values,
+        )
+    except ValueError:
+        # A stray non-numeric cell in a numeric column: keep only the text dtypes
+        return pd.read_csv(path_str, dtype=text, keep_default_na=False, na_values=na_values)
+
+def data_version(path: Path):
+    return st.session_state.setdefault("data_versions", {}).get(path.stem, 0)
+
+def bump_version(path: Path):
+    versions = st.session_state.setdefault("data_versions", {})
+    versions[path.stem] = versions.get(path.stem, 0) + 1
+
+def memo(key: str, version: int, build):
+    # Per-session memo: build() only reruns after the data version moves
+    cache = st.session_state.setdefault("_memo", {})
+    hit = cache.get(key)
+    if hit is None or hit[0] != version:
+        hit = cache[key] = (version, build())
+    return hit[1]
+
+def categorize(df: pd.DataFrame):
+    for col, options in CATEGORICAL_COLS.items():
+        if col in df.columns:
+            extra = sorted(set(df[col].dropna()) - set(options), key=str)
+            df[col] = df[col].astype(pd.CategoricalDtype(options + extra))
+    return df
+
+def concat_rows(df: pd.DataFrame, new: pd.DataFrame):
+    # Append without re-categorizing the whole table: widen each categorical by the new
+    # values only (codes untouched), then cast the new rows to the table's dtypes so the
+    # concat joins like types and nothing is re-inferred or upcast (e.g. Int32 -> Int64)
+    for col in df.select_dtypes("category").columns:
+        if col in new.columns:
+            extra = sorted(set(new[col].dropna()) - set(df[col].cat.categories), key=str)
+            if extra:
+                df[col] = df[col].cat.add_categories(extra)
+    new = new.astype({col: df[col].dtype for col in new.columns if col in df.columns})
+    return pd.concat([df, new], ignore_index=True)
+
+@st.cache_resource(show_spinner=False)
+def io_pool():
+    # Shared by all sessions; lets a save overlap its live-file and backup writes
+    return ThreadPoolExecutor(max_workers=4)
+
+def backup_snapshot(src_path: Path):
+    # Today's snapshot path if it still has to be written, else None. One snapshot per file
+    # per day; once this session has seen it, skip the stat too.
     today = datetime.now().strftime("%Y-%m-%d")
-    snap = BACKUPS_DIR / f"{src_path.stem}_{today}.csv"
-    if not snap.exists():
-        df.to_csv(snap, index=False)
+    snap = BACKUPS_DIR / f"{src_path.stem}_{today}.parquet"
+    done = st.session_state.setdefault("_backups_done", set())
+    if snap.name in done:
+        return None
+    if snap.exists():
+        done.add(snap.name)
+        return None
+    return snap
+
+def backup_written(snap: Path):
+    # Only a successful write counts, so a failed snapshot is retried on the next save
+    st.session_state.setdefault("_backups_done", set()).add(snap.name)
+
+def backup_df(src_path: Path, df: pd.DataFrame):
+    snap = backup_snapshot(src_path)
+    if snap is not None:
+        write_parquet(snap, df)
+        backup_written(snap)
+
+def frame_digest(df: pd.DataFrame):
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+    return hashlib.blake2b(rows + repr(list(df.columns)).encode(), digest_size=16).hexdigest()
+
+def save_df(path: Path, df: pd.DataFrame):
+    # Hashing is far cheaper than a rewrite: skip it when this session already saved the same data
+    # saved_digests maps stem -> (digest on disk, data version right after that save)
+    digest = frame_digest(df)
+    saved = st.session_state.setdefault("saved_digests", {})
+    saved_digest, saved_version = saved.get(path.stem, (None, None))
+    if saved_digest == digest:
+        # Nothing to write, but if the version moved since (edits later reverted), memos
+        # may have been built on the in-between data: move it once more so they rebuild
+        if saved_version != data_version(path):
+            bump_version(path)
+            saved[path.stem] = (digest, data_version(path))
+        st.session_state.setdefault("_dirty", {}).pop(path.stem, None)
+        return
+    # Live file and (first save of the day) backup are written concurrently
+    snap = backup_snapshot(path)
+    live = io_pool().submit(write_parquet, path, df)
+    backup = io_pool().submit(write_parquet, snap, df) if snap is not None else None
+    live.result()
+    # The live file now holds the journaled rows: drop the journal whatever the backup does
+    journal_path(path).unlink(missing_ok=True)
+    bump_version(path)
+    # Recorded only once the live file is written, so a failed save is retried next time
+    # and a pending edit stays dirty until it really is on disk
+    saved[path.stem] = (digest, data_version(path))
+    st.session_state.setdefault("_dirty", {}).pop(path.stem, None)
+    st.session_state.setdefault("_last_saved", {})[path.stem] = time.monotonic()
+    if backup is not None:
+        backup.result()
+        backup_written(snap)
+
+def mark_dirty(path: Path, state_key: str):
+    # Defer the write: this session sees the change now, flush_dirty puts it on disk
+    st.session_state.setdefault("_dirty", {})[path.stem] = (path, state_key)
+    bump_version(path)
+
+def flush_dirty(force: bool = False):
+    # Save every pending frame whose last write is older than AUTOSAVE_INTERVAL_S
+    last_saved = st.session_state.setdefault("_last_saved", {})
+    for stem, (path, state_key) in list(st.session_state.setdefault("_dirty", {}).items()):
+        if force or time.monotonic() - last_saved.get(stem, float("-inf")) >= AUTOSAVE_INTERVAL_S:
+            save_df(path, st.session_state[state_key])
+
+@st.fragment(run_every=AUTOSAVE_INTERVAL_S)
+def autosave_pending():
+    # Streamlit only reruns on interaction, so this timer is what writes held-back edits
+    # once the user goes quiet; the button skips the wait
+    flush_dirty()
+    if st.session_state.get("_dirty"):
+        st.caption("Saving recent edits...")
+        st.button("Save now", on_click=flush_dirty, kwargs={"force": True})
+
+def append_rows(path: Path, rows: list, columns):
+    # O(1)-per-row alternative to save_df for pure additions: CSV lines, no Parquet rewrite
+    journal = journal_path(path)
+    is_new = not journal.exists()
+    with open(journal, "a", encoding="utf-8", newline="", buffering=1 << 16) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if is_new:
+            writer.writerow(columns)
+        writer.writerows(
+            [
+                row[c].strftime(DATE_FMT) if isinstance(row[c], pd.Timestamp) else ("" if pd.isna(row[c]) else row[c])
+                for c in columns
+            ]
+            for row in rows
+        )
+    bump_version(path)
+
+def migrate_csv(path: Path, default_df: pd.DataFrame):
+    # One-shot move from the old CSV storage: only runs while the .csv is the sole copy
+    legacy = path.with_suffix(".csv")
+    if legacy.exists() and not path.exists():
+        dtypes, dates = csv_schema(default_df)
+        try:
+            stream_csv_to_parquet(legacy, path, dtypes, dates)
+        except pa.ArrowInvalid:
+            write_parquet(path, read_csv_typed(str(legacy), dtypes, dates))
+
+def stream_csv_to_parquet(src: Path, path: Path, dtypes: dict, dates: list):
+    # Years of history can be large: parse ~1 MB record batches and write each one straight
+    # to Parquet, so neither the whole file nor a pandas object frame is ever held in memory.
+    # Dtypes are narrowed afterwards by load_df, as for any other read.
+    tmp = temp_path(path)
+    try:
+        reader = pacsv.open_csv(str(src), **arrow_csv_options(dtypes, dates))
+        with pq.ParquetWriter(tmp, reader.schema, compression="zstd") as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+# cache_resource hands back the shared frame without a pickle round-trip, so callers
+# must copy before mutating. mtime is part of the key so a rewrite invalidates it.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _read_parquet_cached(path_str: str, mtime: float):
+    return pd.read_parquet(path_str)
 
-def save_df_csv(path: Path, df: pd.DataFrame):
-    df.to_csv(path, index=False)
-    backup_df_csv(path, df)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _read_journal_cached(path_str: str, mtime: float, dtypes: dict, dates: list):
+    return read_csv_typed(path_str, dtypes, dates)
 
-def load_df_csv(path: Path, default_df: pd.DataFrame):
+def load_df(path: Path, default_df: pd.DataFrame):
+    migrate_csv(path, default_df)
     if path.exists():
-        df = pd.read_csv(path)
-        for col in default_df.columns:
-            if col not in df.columns:
-                df[col] = "" if default_df[col].dtype == "object" else 0
-        return df
-    return default_df.copy()
-
-def status_chip(s):
-    # Always convert to string, handle NaN and numeric safely
-    s = str(s).strip() if not pd.isna(s) else ""
-    mapping = {"Open": "🟡 Open", "Scheduled": "🔵 Scheduled", "Completed": "🟢 Completed"}
-    return mapping.get(s, s)
+        df = _read_parquet_cached(str(path), path.stat().st_mtime).copy()
+    else:
+        df = default_df.copy()
+    journal = journal_path(path)
+    if journal.exists():
+        pending = _read_journal_cached(str(journal), journal.stat().st_mtime, *csv_schema(default_df))
+        # Concat only non-empty frames: pandas warns about (and will change) empty entries
+        if not pending.empty:
+            df = pd.concat([df, pending], ignore_index=True) if not df.empty else pending.copy()
+    for col in default_df.columns:
+        if col not in df.columns:
+            if default_df[col].dtype == "object":
+                df[col] = ""
+            elif pd.api.types.is_datetime64_any_dtype(default_df[col]):
+                df[col] = pd.NaT
+            else:
+                df[col] = 0
+    # Parse text dates once here so the rest of the app works on datetime64
+    for col in default_df.select_dtypes("datetime").columns:
+        df[col] = pd.to_datetime(df[col], errors="coerce", format=DATE_FMT)
+    # Coerce numbers once here; blank measurements count as 0 so totals are plain sums
+    for col, dtype in NUMERIC_COLS.items():
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+            if col != "Ticket ID":
+                values = values.fillna(0)
+            df[col] = (values.round() if dtype == "Int32" else values).astype(dtype)
+    return categorize(df)
+
+STATUS_CHIP = {"Open": "🟡 Open", "Scheduled": "🔵 Scheduled", "Completed": "🟢 Completed"}
+
+def status_chips(status: pd.Series):
+    # Categorical Status: relabel the few categories and keep the row codes as they are
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        return status.cat.rename_categories(lambda c: STATUS_CHIP.get(c, c))
+    # Otherwise a dict lookup per value; unknown statuses pass through unchanged
+    return status.map(STATUS_CHIP).fillna(status).fillna("")
+
+def completed_dates(status: pd.Series, completed: pd.Series):
+    # Completed rows keep their date (today if blank); any other status clears it
+    return completed.fillna(pd.Timestamp(date.today())).where(status.eq("Completed"))
+
+def column_options(col: pd.Series):
+    # Distinct non-null values. Categoricals answer from their categories in O(k), in
+    # declared order; other columns use pd.unique on the raw array, then sort the uniques.
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.categories.tolist()
+    return sorted(v for v in pd.unique(col.to_numpy()) if not pd.isna(v))
 
 def calc_table_height(n_rows, max_visible=30):
     return 40 + (min(n_rows,max_visible)*28)
 
+DATE_COLUMN_CONFIG = {c: st.column_config.DateColumn(c, format="MM/DD/YYYY") for c in DATE_COLS}
+
 # -------------------------------------------------------
 # CSS HIGHLIGHTING (Dark/Light Safe)
 # -------------------------------------------------------
@@ -148,15 +455,15 @@ sample_repairs = pd.DataFrame({
     "Alert Type/Issue":["Brakes","Transmission","Oil Change - PM Service"],
     "Description":["Front pads worn","Transmission leak","Oil + filter change"],
     "Mileage":[32000,32000,28000],
-    "Date":[datetime.now().strftime("%m/%d/%Y")]*3,
-    "Scheduled":["","",""],
+    "Date":[pd.Timestamp(date.today())]*3,
+    "Scheduled":[pd.NaT]*3,
     "Priority Tier (1/2/3)":["Tier 2 (High)","Tier 2 (High)","Tier 3 (PM)"],
     "Assigned to":["Rigo","Rigo","Rigo"],
     "Status":["Open","Scheduled","Completed"],
-    "Open/Miles at":[datetime.now().strftime("%m/%d/%Y")]*3,
+    "Open/Miles at":[pd.Timestamp(date.today())]*3,
     "Downtime (Days)":[0,0,0],
-    "Cost":[0,0,0],
-    "Completed Date":["","",""],
+    "Cost":[0.0,0.0,0.0],
+    "Completed Date":[pd.NaT]*3,
     "Notes":["","",""]
 })
 
@@ -166,20 +473,31 @@ default_alerts_df = pd.DataFrame({"Alert Type": ALERT_TYPES})
 # STATE INIT
 # -------------------------------------------------------
 if "df_trucks" not in st.session_state:
-    st.session_state.df_trucks = load_df_csv(TRUCKS_CSV, default_trucks_df)
+    st.session_state.df_trucks = load_df(TRUCKS_FILE, default_trucks_df)
 
 if "df_repairs" not in st.session_state:
-    st.session_state.df_repairs = load_df_csv(REPAIRS_CSV, sample_repairs)
+    st.session_state.df_repairs = load_df(REPAIRS_FILE, sample_repairs)
 
 if "df_alerts" not in st.session_state:
-    st.session_state.df_alerts = load_df_csv(ALERTS_CSV, default_alerts_df)
+    st.session_state.df_alerts = load_df(ALERTS_FILE, default_alerts_df)
 
 df_trucks = st.session_state.df_trucks
 df_repairs = st.session_state.df_repairs
 df_alerts = st.session_state.df_alerts
 
-truck_to_ymm = dict(zip(df_trucks["Truck #"], df_trucks["Truck Type"]))
-alert_options = df_alerts["Alert Type"].dropna().astype(str).tolist()
+# Write out inline edits that were held back by the auto-save interval
+flush_dirty()
+
+truck_to_ymm = memo(
+    "truck_to_ymm",
+    data_version(TRUCKS_FILE),
+    lambda: dict(zip(df_trucks["Truck #"], df_trucks["Truck Type"])),
+)
+alert_options = memo(
+    "alert_options",
+    data_version(ALERTS_FILE),
+    lambda: df_alerts["Alert Type"].dropna().astype(str).tolist(),
+)
 
 # -------------------------------------------------------
 # SIDEBAR NAV
@@ -196,106 +514,112 @@ action = st.sidebar.selectbox(
 if action == "View & Edit Repairs":
     st.subheader("View & Edit Repairs")
 
-    # Filters
+    # Filters (option lists only rebuilt when the repairs data changes)
+    opts = memo(
+        "filter_options",
+        data_version(REPAIRS_FILE),
+        lambda: {
+            col: column_options(df_repairs[col])
+            for col in ["Status", "Assigned to", "Unit #", "Priority Tier (1/2/3)"]
+        },
+    )
     with st.expander("Filters", expanded=True):
         c1, c2, c3 = st.columns(3)
         with c1:
-            f_status = st.multiselect("Status", sorted(df_repairs["Status"].dropna().unique()))
-            f_assigned = st.multiselect("Assigned To", sorted(df_repairs["Assigned to"].dropna().unique()))
+            f_status = st.multiselect("Status", opts["Status"])
+            f_assigned = st.multiselect("Assigned To", opts["Assigned to"])
         with c2:
-            f_unit = st.multiselect("Unit #", sorted(df_repairs["Unit #"].dropna().unique()))
-            f_priority = st.multiselect("Priority", sorted(df_repairs["Priority Tier (1/2/3)"].dropna().unique()))
+            f_unit = st.multiselect("Unit #", opts["Unit #"])
+            f_priority = st.multiselect("Priority", opts["Priority Tier (1/2/3)"])
         with c3:
             query = st.text_input("Search text (Desc / Notes / Issue)").strip()
 
-    # Filter logic
-    view_df = df_repairs.copy()
-    if f_status:
-        view_df = view_df[view_df["Status"].isin(f_status)]
-    if f_assigned:
-        view_df = view_df[view_df["Assigned to"].isin(f_assigned)]
-    if f_unit:
-        view_df = view_df[view_df["Unit #"].isin(f_unit)]
-    if f_priority:
-        view_df = view_df[view_df["Priority Tier (1/2/3)"].isin(f_priority)]
+    # Filter logic: AND every active filter into one mask, then slice the table once
+    mask = pd.Series(True, index=df_repairs.index)
+    for col, picked in [
+        ("Status", f_status),
+        ("Assigned to", f_assigned),
+        ("Unit #", f_unit),
+        ("Priority Tier (1/2/3)", f_priority),
+    ]:
+        if picked:
+            mask &= df_repairs[col].isin(picked)
     if query:
-        patt = re.compile(re.escape(query), re.IGNORECASE)
-        mask = (
-            view_df["Description"].fillna("").str.contains(patt)
-            | view_df["Alert Type/Issue"].fillna("").str.contains(patt)
-            | view_df["Notes"].fillna("").str.contains(patt)
+        # Single literal pass over the three fields joined by a separator; the
+        # lowercased haystack is only rebuilt when the repairs data changes
+        haystack = memo(
+            "search_haystack",
+            data_version(REPAIRS_FILE),
+            lambda: (
+                df_repairs["Description"].fillna("")
+                + "\x1f" + df_repairs["Alert Type/Issue"].fillna("")
+                + "\x1f" + df_repairs["Notes"].fillna("")
+            ).str.lower(),
         )
-        view_df = view_df[mask]
+        mask &= haystack.str.contains(query.lower(), regex=False)
+    view_df = df_repairs.loc[mask]
 
-    # Status chip column
-    view_df.insert(1, "Status ⬤", view_df["Status"].map(status_chip).fillna(""))
+    # Only the current page is serialized to the browser; row labels still map back to df_repairs
+    page_df = view_df
+    if len(view_df) > PAGE_SIZE:
+        start = st.slider("Start row", 0, len(view_df) - 1, 0, step=PAGE_SIZE)
+        page_df = view_df.iloc[start:start + PAGE_SIZE].copy()
+        st.caption(f"Rows {start + 1}-{start + len(page_df)} of {len(view_df)}")
 
-    # Prepare clean unique columns
-    editable_source = view_df.loc[:, ~view_df.columns.duplicated()].reset_index(drop=True)
+    # Status chip column
+    page_df.insert(1, "Status ⬤", status_chips(page_df["Status"]))
 
     # Editable table
-    st.caption("Click directly in any cell to edit - changes save automatically.")
+    st.caption(f"Click directly in any cell to edit - changes are saved within {AUTOSAVE_INTERVAL_S:g} seconds.")
     edited_df = st.data_editor(
-        editable_source,
+        page_df,
         use_container_width=True,
         hide_index=True,
-        height=calc_table_height(len(view_df)),
+        height=calc_table_height(len(page_df)),
         column_config={
             "Ticket ID": st.column_config.NumberColumn("Ticket ID", disabled=True),
             "Status ⬤": st.column_config.TextColumn("Status ⬤", disabled=True),
-            "Status": st.column_config.SelectboxColumn("Status", options=["Open", "Scheduled", "Completed"]),
-            "Priority Tier (1/2/3)": st.column_config.SelectboxColumn(
-                "Priority Tier (1/2/3)",
-                options=[
-                    "Tier 1 (Critical)",
-                    "Tier 2 (High)",
-                    "Tier 3 (PM)",
-                    "Tier 4 (Non-Critical)",
-                ],
-            ),
+            "Status": st.column_config.SelectboxColumn("Status", options=STATUS_OPTIONS),
+            "Priority Tier (1/2/3)": st.column_config.SelectboxColumn("Priority Tier (1/2/3)", options=PRIORITY_OPTIONS),
             "Assigned to": st.column_config.TextColumn("Assigned to"),
             "Alert Type/Issue": st.column_config.TextColumn("Alert Type/Issue"),
             "Downtime (Days)": st.column_config.NumberColumn("Downtime (Days)", min_value=0, step=1),
             "Cost": st.column_config.NumberColumn("Cost", min_value=0.0, step=1.0, format="$%.2f"),
             "Notes": st.column_config.TextColumn("Notes"),
+            **DATE_COLUMN_CONFIG,
         },
         key="editable_repairs",
     )
 
-    # Auto-save changes
-    if not edited_df.equals(view_df.reset_index(drop=True)):
-        for _, row in edited_df.iterrows():
-            ticket_id = row["Ticket ID"]
-            mask = (
-                (st.session_state.df_repairs["Ticket ID"] == ticket_id)
-                & (st.session_state.df_repairs["Alert Type/Issue"] == row["Alert Type/Issue"])
-            )
-            if mask.any():
-                for col in [
-                    "Status",
-                    "Priority Tier (1/2/3)",
-                    "Assigned to",
-                    "Alert Type/Issue",
-                    "Downtime (Days)",
-                    "Cost",
-                    "Notes",
-                ]:
-                    st.session_state.df_repairs.loc[mask, col] = row[col]
-
-                # Completed date logic
-                if row["Status"] == "Completed":
-                    st.session_state.df_repairs.loc[mask, "Completed Date"] = date.today().strftime("%m/%d/%Y")
-                else:
-                    st.session_state.df_repairs.loc[mask, "Completed Date"] = ""
-
-        save_df_csv(REPAIRS_CSV, st.session_state.df_repairs)
-        st.toast("Changes saved automatically", icon="💾")
+    # Auto-save changes: the editor returns page_df's own index, so find the rows that differ
+    # and write them back in one aligned assignment (edits to the match keys can't get lost)
+    mutable_cols = [
+        "Status",
+        "Priority Tier (1/2/3)",
+        "Assigned to",
+        "Alert Type/Issue",
+        "Downtime (Days)",
+        "Cost",
+        "Notes",
+    ]
+    before, after = page_df[mutable_cols], edited_df[mutable_cols]
+    same = (after.eq(before) | (after.isna() & before.isna())).fillna(False)
+    changed = edited_df.index[~same.all(axis=1)]
+    if len(changed):
+        st.session_state.df_repairs.loc[changed, mutable_cols] = edited_df.loc[changed, mutable_cols]
+        st.session_state.df_repairs.loc[changed, "Completed Date"] = completed_dates(
+            edited_df.loc[changed, "Status"], st.session_state.df_repairs.loc[changed, "Completed Date"]
+        )
+        mark_dirty(REPAIRS_FILE, "df_repairs")
+        flush_dirty()
+        if REPAIRS_FILE.stem not in st.session_state["_dirty"]:
+            st.toast("Changes saved automatically", icon="💾")
 
     # Totals (Downtime counted once per Ticket ID)
     total_repairs = len(view_df)
-    total_cost = pd.to_numeric(view_df["Cost"], errors="coerce").sum()
+    total_cost = view_df["Cost"].sum()
     unique_tickets = view_df.drop_duplicates(subset=["Ticket ID"])
-    total_down = pd.to_numeric(unique_tickets["Downtime (Days)"], errors="coerce").sum()
+    total_down = unique_tickets["Downtime (Days)"].sum()
 
     c1, c2, c3 = st.columns(3)
     c1.metric("Total Repairs", total_repairs)
@@ -308,7 +632,11 @@ if action == "View & Edit Repairs":
 elif action == "Add & Update Ticket":
     st.subheader("Add & Update Ticket")
 
-    tickets = sorted(st.session_state.df_repairs["Ticket ID"].dropna().unique().tolist())
+    tickets = memo(
+        "ticket_options",
+        data_version(REPAIRS_FILE),
+        lambda: column_options(st.session_state.df_repairs["Ticket ID"]),
+    )
     ticket_choice = st.selectbox("Select Ticket", ["Create New Ticket"] + [str(t) for t in tickets])
 
     if ticket_choice == "Create New Ticket":
@@ -328,8 +656,8 @@ elif action == "Add & Update Ticket":
             st.text_input("YMM", value=ymm, disabled=True)
             assigned = st.text_input("Assigned To")
         with c2:
-            priority = st.selectbox("Priority", ["Tier 1 (Critical)", "Tier 2 (High)", "Tier 3 (PM)", "Tier 4 (Non-Critical)"])
-            overall_status = st.selectbox("Overall Ticket Status", ["Open", "Scheduled", "Completed"])
+            priority = st.selectbox("Priority", PRIORITY_OPTIONS)
+            overall_status = st.selectbox("Overall Ticket Status", STATUS_OPTIONS)
             notes_main = st.text_area("Notes (applies to all)")
 
     # -------------------------------------------------------
@@ -350,21 +678,22 @@ elif action == "Add & Update Ticket":
                 hide_index=True,
                 column_config={
                     "RowID": st.column_config.NumberColumn("RowID", disabled=True),
-                    "Status": st.column_config.SelectboxColumn("Status", options=["Open", "Scheduled", "Completed"]),
+                    "Status": st.column_config.SelectboxColumn("Status", options=STATUS_OPTIONS),
                     "Cost": st.column_config.NumberColumn("Cost", min_value=0.0, step=1.0, format="$%.2f"),
                     "Notes": st.column_config.TextColumn("Notes"),
+                    **DATE_COLUMN_CONFIG,
                 },
                 height=calc_table_height(len(existing_clean), 20),
             )
             if st.button("💾 Update Existing Alerts"):
-                for _, row in edit_existing.iterrows():
-                    rid = row["RowID"]
-                    st.session_state.df_repairs.loc[rid, edit_existing.columns] = row.values
-                    if row["Status"] == "Completed" and not str(row["Completed Date"]).strip():
-                        st.session_state.df_repairs.at[rid, "Completed Date"] = date.today().strftime("%m/%d/%Y")
-                    elif row["Status"] != "Completed":
-                        st.session_state.df_repairs.at[rid, "Completed Date"] = ""
-                save_df_csv(REPAIRS_CSV, st.session_state.df_repairs)
+                # One aligned write for all rows instead of a per-row loop
+                edited = edit_existing.set_index("RowID")
+                cols = [c for c in edited.columns if c in st.session_state.df_repairs.columns]
+                st.session_state.df_repairs.loc[edited.index, cols] = edited[cols]
+                st.session_state.df_repairs.loc[edited.index, "Completed Date"] = completed_dates(
+                    edited["Status"], edited["Completed Date"]
+                )
+                save_df(REPAIRS_FILE, st.session_state.df_repairs)
                 st.success("Existing alerts updated!")
 
     # -------------------------------------------------------
@@ -381,12 +710,14 @@ elif action == "Add & Update Ticket":
                 "Custom Type": st.column_config.TextColumn("Custom Type (if Other selected)"),
                 "Description": st.column_config.TextColumn("Description"),
                 "Mileage": st.column_config.NumberColumn("Mileage", min_value=0, step=1),
-                "Status": st.column_config.SelectboxColumn("Status", options=["Open", "Scheduled", "Completed"]),
+                "Status": st.column_config.SelectboxColumn("Status", options=STATUS_OPTIONS),
             },
             height=280,
         )
 
         if st.button("💾 Save Ticket & Alerts"):
+            new_rows = []
+            today = pd.Timestamp(date.today())
             for _, row in new_alerts.iterrows():
                 alert_type = str(row["Alert Type/Issue"]).strip()
                 if not alert_type:
@@ -394,30 +725,30 @@ elif action == "Add & Update Ticket":
                 if alert_type == "Other (type below)" and str(row.get("Custom Type", "")).strip():
                     alert_type = str(row["Custom Type"]).strip()
 
-                completed_date = date.today().strftime("%m/%d/%Y") if row["Status"] == "Completed" else ""
-                new_row = {
+                completed_date = today if row["Status"] == "Completed" else pd.NaT
+                new_rows.append({
                     "Ticket ID": ticket_id,
                     "Unit #": unit,
                     "YMM": ymm,
                     "Alert Type/Issue": alert_type,
-                    "Description": row["Description"],
+                    "Description": row["Description"] or "",
                     "Mileage": int(row["Mileage"] or 0),
-                    "Date": date.today().strftime("%m/%d/%Y"),
-                    "Scheduled": date.today().strftime("%m/%d/%Y") if row["Status"] == "Scheduled" else "",
+                    "Date": today,
+                    "Scheduled": today if row["Status"] == "Scheduled" else pd.NaT,
                     "Priority Tier (1/2/3)": priority,
                     "Assigned to": assigned,
                     "Status": row["Status"],
-                    "Open/Miles at": date.today().strftime("%m/%d/%Y"),
+                    "Open/Miles at": today,
                     "Downtime (Days)": 0,
                     "Cost": 0.0,
                     "Completed Date": completed_date,
                     "Notes": notes_main,
-                }
-                st.session_state.df_repairs = pd.concat(
-                    [st.session_state.df_repairs, pd.DataFrame([new_row])],
-                    ignore_index=True,
-                )
-            save_df_csv(REPAIRS_CSV, st.session_state.df_repairs)
+                })
+            # One concat and one journal write for the whole batch
+            if new_rows:
+                st.session_state.df_repairs = concat_rows(st.session_state.df_repairs, pd.DataFrame(new_rows))
+                append_rows(REPAIRS_FILE, new_rows, list(new_rows[0]))
+                backup_df(REPAIRS_FILE, st.session_state.df_repairs)
             st.success(f"Ticket {ticket_id} saved with {len(new_alerts)} alerts!")
 
 # -------------------------------------------------------
@@ -434,21 +765,21 @@ elif action == "Manage Trucks":
             tnum = st.text_input("Truck #")
             ttype = st.text_input("Truck Type")
         with c2:
-            stype = st.selectbox("Service Type", ["SERVICE","FLATBED","AUTO LOADER","TRACTOR","TRAILER","WRECKER"])
+            stype = st.selectbox("Service Type", SERVICE_TYPES)
         if st.button("Add Truck"):
             if not tnum or not ttype:
                 st.error("Truck # and Type required.")
             else:
                 new = pd.DataFrame({"Truck #":[tnum],"Truck Type":[ttype],"Service Type":[stype]})
-                st.session_state.df_trucks = pd.concat([st.session_state.df_trucks,new],ignore_index=True)
-                save_df_csv(TRUCKS_CSV,st.session_state.df_trucks)
+                st.session_state.df_trucks = concat_rows(st.session_state.df_trucks,new)
+                save_df(TRUCKS_FILE,st.session_state.df_trucks)
                 st.success("Truck added!")
     elif opt=="Delete Truck":
         st.dataframe(df_trucks,use_container_width=True)
         idx = st.number_input("Row index to delete",0,len(df_trucks)-1)
         if st.button("Delete"):
             st.session_state.df_trucks = df_trucks.drop(index=idx).reset_index(drop=True)
-            save_df_csv(TRUCKS_CSV,st.session_state.df_trucks)
+            save_df(TRUCKS_FILE,st.session_state.df_trucks)
             st.success("Truck deleted!")
 
 # -------------------------------------------------------
@@ -474,7 +805,7 @@ elif action == "Manage Alerts":
             else:
                 new_row = pd.DataFrame({"Alert Type":[alert_clean]})
                 st.session_state.df_alerts = pd.concat([df_alerts, new_row], ignore_index=True)
-                save_df_csv(ALERTS_CSV, st.session_state.df_alerts)
+                save_df(ALERTS_FILE, st.session_state.df_alerts)
                 st.success(f"Added alert type: {alert_clean}")
 
     elif opt == "Delete Alert":
@@ -485,7 +816,7 @@ elif action == "Manage Alerts":
             to_delete = st.selectbox("Select Alert Type to delete", current_alerts)
             if st.button("Delete Alert Type", type="primary"):
                 st.session_state.df_alerts = df_alerts[df_alerts["Alert Type"] != to_delete].reset_index(drop=True)
-                save_df_csv(ALERTS_CSV, st.session_state.df_alerts)
+                save_df(ALERTS_FILE, st.session_state.df_alerts)
                 st.success(f"Deleted alert type: {to_delete}")
 
 # -------------------------------------------------------
@@ -496,17 +827,28 @@ elif action == "Trend":
     if df_repairs.empty:
         st.info("No repair data yet.")
     else:
-        units = sorted(df_repairs["Unit #"].dropna().unique().tolist())
+        # Per-unit figures from one groupby, rebuilt only when the repairs data changes
+        trend = memo(
+            "trend",
+            data_version(REPAIRS_FILE),
+            lambda: {
+                unit: (len(sub), sub["Alert Type/Issue"].value_counts().head(5).reset_index())
+                for unit, sub in df_repairs.groupby("Unit #", observed=True)
+            },
+        )
+        units = sorted(trend)
         u = st.selectbox("Unit #", units)
-        u_df = df_repairs[df_repairs["Unit #"]==u].copy()
-        if u_df.empty:
+        if u not in trend:
             st.info("No data for this unit.")
         else:
-            u_df["Date_dt"] = pd.to_datetime(u_df["Date"],errors="coerce")
-            st.metric("Total Repairs",len(u_df))
-            top = u_df["Alert Type/Issue"].value_counts().head(5).reset_index()
+            total, top = trend[u]
+            st.metric("Total Repairs",total)
             st.dataframe(top,use_container_width=True)
 
 
 
 
+# Edits held back by AUTOSAVE_INTERVAL_S get a timer that flushes them without a full rerun
+if st.session_state.get("_dirty"):
+    with st.sidebar:
+        autosave_pending()